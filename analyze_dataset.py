@@ -11,6 +11,72 @@ from collections import Counter, defaultdict
 from datetime import datetime
 import json
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# Pattern definitions (compiled once at import)
+NOISE_REGEX = {
+    'separator_lines': re.compile(r'^[-=_~*+#]{10,}', re.MULTILINE | re.IGNORECASE),
+    'empty_lines': re.compile(r'^\s*$', re.MULTILINE | re.IGNORECASE),
+    'debug_lines': re.compile(r'^\s*(DEBUG|INFO|WARNING|ERROR):', re.MULTILINE | re.IGNORECASE),
+    'command_noise': re.compile(r'^\s*(quit|exit|end|return)\s*$', re.MULTILINE | re.IGNORECASE),
+    'html_tags': re.compile(r'<[^>]+>', re.MULTILINE | re.IGNORECASE)
+}
+
+FIELD_REGEX = {
+    'ip_addresses': re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b', re.IGNORECASE),
+    'vlan_ids': re.compile(r'VLAN\s*:?\s*\d+', re.IGNORECASE),
+    'serial_numbers': re.compile(r'SN[:\s]*[A-Za-z0-9]+', re.IGNORECASE),
+    'ticket_numbers': re.compile(r'#\d{8}-\d+', re.IGNORECASE),
+    'equipment_codes': re.compile(r'OLT-[A-Z0-9-]+', re.IGNORECASE),
+    'service_codes': re.compile(r'[A-Z]{3,}/[A-Z]{2,}/\d+', re.IGNORECASE),
+    'asn_numbers': re.compile(r'AS\s*Cliente[:\s]*\d+', re.IGNORECASE),
+    'mac_addresses': re.compile(r'([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}', re.IGNORECASE)
+}
+
+def build_scan_regex(regexes, flags):
+    """One overlap-safe scan for a family of patterns.
+    
+    The leading lookahead stops only where some pattern starts; an optional
+    lookahead per pattern then captures that pattern's match in a named group
+    without consuming it, so patterns never hide each other.
+    """
+    any_pattern = '|'.join(f'(?:{regex.pattern})' for regex in regexes.values())
+    captures = ''.join(f'(?:(?=(?P<{name}>{regex.pattern})))?' for name, regex in regexes.items())
+    return re.compile(f'(?=(?:{any_pattern})){captures}', flags)
+
+def count_pattern_matches(scan_regex, text, counts):
+    """Add each pattern's non-overlapping matches in text to counts (same totals as re.findall)"""
+    next_start = dict.fromkeys(counts, 0)
+    for match in scan_regex.finditer(text):
+        for name, value in match.groupdict().items():
+            # A pattern's next match may only start where its previous one ended
+            if value is not None and match.start(name) >= next_start[name]:
+                counts[name] += 1
+                next_start[name] = match.end(name)
+
+# Each pattern family as a single scan per text (see build_scan_regex)
+NOISE_SCAN_REGEX = build_scan_regex(NOISE_REGEX, re.MULTILINE | re.IGNORECASE)
+FIELD_SCAN_REGEX = build_scan_regex(FIELD_REGEX, re.IGNORECASE)
+
+# Line-level noise removed by the cleaning simulation (separator lines, empty hash
+# lines, debug lines, command noise) as one alternation, so the text is scanned once
+CLEANING_LINE_REGEX = re.compile(
+    r'^[-=_~*+#]{10,}.*$'
+    r'|^#+\s*$'
+    r'|^\s*(?:DEBUG|INFO|WARNING|ERROR):.*$'
+    r'|^\s*(?:quit|exit|end|return)\s*$',
+    re.MULTILINE
+)
+
+# Newline and space/tab runs never overlap, so both collapse in a single pass
+WHITESPACE_RUN_REGEX = re.compile(r'(?P<newlines>\n{3,})|(?P<spaces>[ \t]{3,})')
+WHITESPACE_RUN_REPLACEMENTS = {'newlines': '\n\n', 'spaces': ' '}
+
 class LargeSampleAnalyzer:
     """
     Analyzes large CSV datasets to optimize text cleaning and extraction patterns
@@ -88,47 +154,64 @@ class LargeSampleAnalyzer:
             print(traceback.format_exc())
             return None
     
-    def _get_file_overview(self, csv_file_path, obs_column):
+    def _get_file_overview(self, csv_file_path, obs_column, chunk_size=100000):
         """Get basic file information"""
         try:
-            # Read just the header and a few rows for quick analysis
-            df_sample = pd.read_csv(csv_file_path, nrows=10)
-            
-            # Get total row count efficiently
-            total_rows = sum(1 for _ in open(csv_file_path, 'r', encoding='utf-8')) - 1  # -1 for header
+            # Read just the header for the column list (no data rows parsed)
+            columns = pd.read_csv(csv_file_path, nrows=0).columns
             
             info = {
                 'file_path': csv_file_path,
-                'total_rows': total_rows,
-                'total_columns': len(df_sample.columns),
-                'columns': list(df_sample.columns),
-                'obs_column_exists': obs_column in df_sample.columns,
+                'total_columns': len(columns),
+                'columns': list(columns),
+                'obs_column_exists': obs_column in columns,
             }
             
-            # Count non-null obs entries
-            if obs_column in df_sample.columns:
-                # Sample approach to estimate non-null entries
-                sample_size = min(1000, total_rows)
-                df_check = pd.read_csv(csv_file_path, nrows=sample_size)
-                non_null_ratio = df_check[obs_column].notna().sum() / len(df_check)
-                info['non_null_obs'] = int(total_rows * non_null_ratio)
-            else:
-                info['non_null_obs'] = 0
+            # Stream the file in chunks, keeping only row and non-null obs counts
+            # (peak memory stays O(chunk) instead of O(file))
+            usecols = [obs_column] if info['obs_column_exists'] else [columns[0]]
+            total_rows = 0
+            non_null_obs = 0
+            for chunk in pd.read_csv(csv_file_path, usecols=usecols, chunksize=chunk_size):
+                total_rows += len(chunk)
+                if info['obs_column_exists']:
+                    non_null_obs += int(chunk[obs_column].notna().sum())
+            
+            info['total_rows'] = total_rows
+            info['non_null_obs'] = non_null_obs
             
             return info
             
         except Exception as e:
             return {'error': str(e)}
     
+    def _read_full_csv(self, csv_file_path):
+        """Read the whole CSV, with the multi-threaded pyarrow reader when available"""
+        if pacsv is not None:
+            try:
+                table = pacsv.read_csv(
+                    csv_file_path,
+                    read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 23),
+                    parse_options=pacsv.ParseOptions(newlines_in_values=True)
+                )
+                return table.to_pandas(self_destruct=True, split_blocks=True)
+            except pa.ArrowInvalid:
+                pass
+        
+        return pd.read_csv(csv_file_path, low_memory=False)
+    
     def _get_stratified_sample(self, csv_file_path, obs_column, sample_size):
         """Get a representative stratified sample"""
         try:
             # Read the full dataset (for datasets up to 33K this should be manageable)
             print(f"   Reading dataset for sampling...")
-            df = pd.read_csv(csv_file_path, low_memory=False)
+            df = self._read_full_csv(csv_file_path)
             
-            # Filter to rows with non-null obs data
-            df_with_obs = df[df[obs_column].notna() & (df[obs_column] != '')].copy()
+            # Filter to rows with non-null obs data (one fused mask on the raw array;
+            # take() already returns a new frame, so no extra copy is needed)
+            obs_values = df[obs_column].to_numpy()
+            has_obs = pd.notna(obs_values) & (obs_values != '')
+            df_with_obs = df.take(has_obs.nonzero()[0])
             
             if len(df_with_obs) == 0:
                 print("   ⚠️ No valid obs data found")
@@ -146,10 +229,7 @@ class LargeSampleAnalyzer:
             samples = []
             per_bin = sample_size // df_with_obs['length_bin'].nunique()
             
-            for bin_name in df_with_obs['length_bin'].unique():
-                if pd.isna(bin_name):
-                    continue
-                bin_data = df_with_obs[df_with_obs['length_bin'] == bin_name]
+            for bin_name, bin_data in df_with_obs.groupby('length_bin', sort=False, observed=True):
                 bin_sample = bin_data.sample(n=min(per_bin, len(bin_data)), random_state=42)
                 samples.append(bin_sample)
             
@@ -188,15 +268,17 @@ class LargeSampleAnalyzer:
         try:
             obs_texts = df[obs_column].dropna().astype(str)
             
-            # Basic text statistics
+            # Basic text statistics (lengths computed once; lines counted without
+            # building a list per text)
+            text_lengths = obs_texts.str.len()
             results['text_stats'] = {
                 'total_entries': len(obs_texts),
-                'avg_length': obs_texts.str.len().mean(),
-                'median_length': obs_texts.str.len().median(),
-                'max_length': obs_texts.str.len().max(),
-                'min_length': obs_texts.str.len().min(),
-                'total_chars': obs_texts.str.len().sum(),
-                'avg_lines': obs_texts.str.split('\n').str.len().mean(),
+                'avg_length': text_lengths.mean(),
+                'median_length': text_lengths.median(),
+                'max_length': text_lengths.max(),
+                'min_length': text_lengths.min(),
+                'total_chars': text_lengths.sum(),
+                'avg_lines': obs_texts.str.count('\n').mean() + 1,
             }
             
             # Analyze noise patterns
@@ -220,37 +302,11 @@ class LargeSampleAnalyzer:
                 'mac_addresses': 0
             }
             
-            # Pattern definitions
-            noise_regex = {
-                'separator_lines': r'^[-=_~*+#]{10,}',
-                'empty_lines': r'^\s*$',
-                'debug_lines': r'^\s*(DEBUG|INFO|WARNING|ERROR):',
-                'command_noise': r'^\s*(quit|exit|end|return)\s*$',
-                'html_tags': r'<[^>]+>'
-            }
-            
-            field_regex = {
-                'ip_addresses': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
-                'vlan_ids': r'VLAN\s*:?\s*\d+',
-                'serial_numbers': r'SN[:\s]*[A-Za-z0-9]+',
-                'ticket_numbers': r'#\d{8}-\d+',
-                'equipment_codes': r'OLT-[A-Z0-9-]+',
-                'service_codes': r'[A-Z]{3,}/[A-Z]{2,}/\d+',
-                'asn_numbers': r'AS\s*Cliente[:\s]*\d+',
-                'mac_addresses': r'([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}'
-            }
-            
-            # Count patterns in sample
+            # Count patterns in sample: one scan per family and text (texts are scanned
+            # separately, so matches never cross record boundaries)
             for text in obs_texts.head(min(500, len(obs_texts))):  # Analyze subset for speed
-                # Count noise patterns
-                for pattern_name, regex in noise_regex.items():
-                    matches = len(re.findall(regex, text, re.MULTILINE | re.IGNORECASE))
-                    noise_patterns[pattern_name] += matches
-                
-                # Count field patterns
-                for pattern_name, regex in field_regex.items():
-                    matches = len(re.findall(regex, text, re.IGNORECASE))
-                    field_patterns[pattern_name] += matches
+                count_pattern_matches(NOISE_SCAN_REGEX, text, noise_patterns)
+                count_pattern_matches(FIELD_SCAN_REGEX, text, field_patterns)
             
             results['noise_patterns'] = noise_patterns
             results['field_patterns'] = field_patterns
@@ -279,23 +335,11 @@ class LargeSampleAnalyzer:
         
         cleaned = text
         
-        # Remove separator lines
-        cleaned = re.sub(r'^[-=_~*+#]{10,}.*$', '', cleaned, flags=re.MULTILINE)
-        
-        # Remove empty hash lines
-        cleaned = re.sub(r'^#+\s*$', '', cleaned, flags=re.MULTILINE)
-        
-        # Remove debug lines
-        cleaned = re.sub(r'^\s*(DEBUG|INFO|WARNING|ERROR):.*$', '', cleaned, flags=re.MULTILINE)
-        
-        # Remove command noise
-        cleaned = re.sub(r'^\s*(quit|exit|end|return)\s*$', '', cleaned, flags=re.MULTILINE)
-        
-        # Clean multiple newlines
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+        # Remove separator lines, empty hash lines, debug lines and command noise
+        cleaned = CLEANING_LINE_REGEX.sub('', cleaned)
         
-        # Remove excessive whitespace
-        cleaned = re.sub(r'[ \t]{3,}', ' ', cleaned)
+        # Clean multiple newlines and excessive whitespace
+        cleaned = WHITESPACE_RUN_REGEX.sub(lambda match: WHITESPACE_RUN_REPLACEMENTS[match.lastgroup], cleaned)
         
         return cleaned.strip()
     
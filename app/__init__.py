@@ -2,6 +2,11 @@ from flask import Flask
 import os
 import logging
 
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 def create_app():
     """Simple Flask app factory"""
     app = Flask(__name__, 
@@ -14,7 +19,11 @@ def create_app():
         'UPLOAD_FOLDER': os.path.join(project_root, 'uploads'),
         'DOWNLOAD_FOLDER': os.path.join(project_root, 'downloads'),
         'MAX_CONTENT_LENGTH': 100 * 1024 * 1024,  # 100MB
-        'SECRET_KEY': 'dev-secret-key-change-in-production'
+        'SECRET_KEY': 'dev-secret-key-change-in-production',
+        # Response compression (results/preview pages embed large base64 charts)
+        'COMPRESS_ALGORITHM': ['br', 'gzip'],
+        'COMPRESS_LEVEL': 4,
+        'COMPRESS_BR_LEVEL': 4
     })
     
     for folder in [app.config['UPLOAD_FOLDER'], app.config['DOWNLOAD_FOLDER']]:
@@ -22,6 +31,9 @@ def create_app():
     
     logging.basicConfig(level=logging.INFO)
     
+    if Compress is not None:
+        Compress(app)
+    
     from app.routes import bp
     app.register_blueprint(bp)
     
@@ -1,11 +1,29 @@
 from flask import Blueprint, render_template, request, jsonify, send_file, flash, redirect, url_for, current_app
 from werkzeug.utils import secure_filename
+from flask_wtf.csrf import validate_csrf
+from wtforms.validators import ValidationError
 import os
 import uuid
 from datetime import datetime
 import threading
+import time
 import traceback
+import gc
+import hashlib
+import shutil
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import re
+from collections import OrderedDict
+from urllib.parse import unquote
+from dataclasses import dataclass
+from typing import Optional
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from pyarrow import feather
 
 # Import core modules
 from app.forms import UploadForm
@@ -15,7 +33,131 @@ from core.data_visualizer import GroupBasedDataVisualizer
 from core.product_groups import product_group_manager
 
 bp = Blueprint('main', __name__)
-processing_status = {}
+
+@dataclass(slots=True)
+class ProcessingStatus:
+    """Processing state of an upload session (updated in place by the worker thread)"""
+    file_path: str
+    chunk_size: int
+    export_formats: str
+    status: str = 'processing'
+    progress: int = 0
+    message: str = 'Iniciando processamento...'
+    results: Optional[dict] = None
+    finished_at: Optional[float] = None
+
+class SessionStore:
+    """Thread-safe, size-bounded LRU map of session id -> ProcessingStatus"""
+    
+    def __init__(self, max_sessions=128, results_ttl=30 * 60):
+        self.max_sessions = max_sessions
+        self.results_ttl = results_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+    
+    def __getitem__(self, session_id):
+        with self._lock:
+            status = self._sessions[session_id]
+            self._sessions.move_to_end(session_id)
+            return status
+    
+    def get(self, session_id, default=None):
+        try:
+            return self[session_id]
+        except KeyError:
+            return default
+    
+    def __setitem__(self, session_id, status):
+        with self._lock:
+            self._sessions[session_id] = status
+            self._sessions.move_to_end(session_id)
+            self._release_stale_results()
+            self._evict()
+    
+    def update(self, session_id, **fields):
+        """Set several status fields atomically with respect to readers"""
+        with self._lock:
+            status = self._sessions.get(session_id)
+            if status is not None:
+                for name, value in fields.items():
+                    setattr(status, name, value)
+    
+    def snapshot(self, session_id, *fields):
+        """Consistent copy of some status fields (None if the session is unknown)"""
+        with self._lock:
+            status = self._sessions.get(session_id)
+            if status is None:
+                return None
+            return {name: getattr(status, name) for name in fields}
+    
+    def _evict(self):
+        # Least recently used finished sessions go first; running jobs are never evicted
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        finished = [sid for sid, status in self._sessions.items() if status.status != 'processing']
+        for session_id in finished[:excess]:
+            status = self._sessions.pop(session_id)
+            # Nothing references the session's Arrow copy of the processed frame anymore
+            dataframe_path = status.results.get('dataframe_path') if status.results else None
+            if dataframe_path:
+                try:
+                    os.remove(dataframe_path)
+                except OSError:
+                    pass
+    
+    def _release_stale_results(self):
+        # Sessions finished more than results_ttl ago keep their download paths but
+        # drop any in-memory dataframe
+        cutoff = time.monotonic() - self.results_ttl
+        for status in self._sessions.values():
+            if status.results and status.finished_at is not None and status.finished_at < cutoff:
+                status.results.pop('dataframe', None)
+
+processing_status = SessionStore()
+
+# Export format values accepted by the streamed upload (same choices as UploadForm)
+STREAM_EXPORT_FORMATS = {'csv', 'excel', 'json', 'both', 'all'}
+
+# Processing jobs run in worker processes so concurrent sessions don't share the GIL.
+# Each worker loads a whole CSV, so only a few run at once.
+MAX_JOB_WORKERS = min(2, os.cpu_count() or 1)
+_job_executor = None
+_job_manager = None
+_job_executor_lock = threading.Lock()
+
+# Patterns that match the existing CSV columns (quick analysis field detection)
+SAMPLE_FIELD_PATTERNS = {
+    'ip_management': r'IP\s*(?:CPE|management)[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})',
+    'gateway': r'GTW[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})',
+    'ip_block': r'BLOCO\s*IP[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}/\d+)',
+    'vlan': r'VLAN\s*:?\s*(\d+)',
+    'serial_code': r'SN[:\s]*([A-Za-z0-9]+)',
+    'wifi_ssid': r'SSID[:\s]*([A-Za-z0-9_-]+)',
+    'wifi_passcode': r'password[:\s]*([A-Za-z0-9@#$%^&*()_+-=]+)',
+    'asn': r'AS\s*Cliente[:\s]*(\d+)',
+    'mac': r'([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})',
+    'cpe': r'(OLT-[A-Z0-9-]+)',
+    'model_onu': r'ONU[:\s]*([A-Za-z0-9-]+)'
+}
+
+# All fields in one scan, compiled once at import. The leading lookahead stops only
+# where some field starts; each field's optional lookahead captures its match in a
+# named group without consuming it, so overlapping fields (e.g. "ONU SN: ...") are
+# all seen
+SAMPLE_FIELD_SCAN_REGEX = re.compile(
+    '(?=' + '|'.join(f'(?:{pattern})' for pattern in SAMPLE_FIELD_PATTERNS.values()) + ')'
+    + ''.join(f'(?:(?=(?P<{field_name}>{pattern})))?' for field_name, pattern in SAMPLE_FIELD_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+# Existing columns whose fill rate is reported by the sample preview
+SAMPLE_COMPLETENESS_COLUMNS = ('ip_management', 'gateway', 'ip_block', 'vlan', 'serial_code',
+                               'wifi_ssid', 'wifi_passcode', 'asn', 'mac', 'cpe', 'model_onu')
 
 @bp.route('/')
 def index():
@@ -29,24 +171,19 @@ def upload():
     
     if form.validate_on_submit():
         # Generate session ID
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex
         
         # Save uploaded file
         file = form.file.data
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{timestamp}_{filename}")
-        file.save(upload_path)
+        upload_path = save_upload(file.stream, filename)
         
         # Store processing config
-        processing_status[session_id] = {
-            'file_path': upload_path,
-            'chunk_size': form.chunk_size.data,
-            'export_formats': form.export_formats.data,
-            'status': 'processing',
-            'progress': 0,
-            'message': 'Iniciando processamento...',
-        }
+        processing_status[session_id] = ProcessingStatus(
+            file_path=upload_path,
+            chunk_size=form.chunk_size.data,
+            export_formats=form.export_formats.data
+        )
         
         # Start background processing
         thread = threading.Thread(target=process_file, args=(current_app._get_current_object(), session_id))
@@ -57,6 +194,54 @@ def upload():
     
     return render_template('upload.html', form=form)
 
+@bp.route('/upload-stream', methods=['POST'])
+def upload_stream():
+    """Streamed upload for large files: raw request body written straight to disk"""
+    # No multipart form here, so the CSRF token travels in a header
+    try:
+        validate_csrf(request.headers.get('X-CSRFToken'))
+    except ValidationError:
+        return jsonify({'error': 'Token CSRF inválido'}), 400
+    
+    # The client percent-encodes the name (header values are limited to ISO-8859-1)
+    filename = secure_filename(unquote(request.headers.get('X-Filename', '')))
+    if not filename.lower().endswith('.csv'):
+        return jsonify({'error': 'Apenas arquivos CSV são permitidos'}), 400
+    
+    try:
+        chunk_size = int(request.headers.get('X-Chunk-Size', 5000))
+    except ValueError:
+        chunk_size = 0
+    if not 100 <= chunk_size <= 10000:
+        return jsonify({'error': 'Tamanho do lote deve estar entre 100 e 10000'}), 400
+    
+    export_formats = request.headers.get('X-Export-Formats', 'both')
+    if export_formats not in STREAM_EXPORT_FORMATS:
+        return jsonify({'error': f'Formato de exportação inválido: {export_formats}'}), 400
+    
+    # Generate session ID
+    session_id = uuid.uuid4().hex
+    
+    # Copy the body straight to disk (MAX_CONTENT_LENGTH still applies to the stream)
+    upload_path = save_upload(request.stream, filename)
+    
+    # Store processing config
+    processing_status[session_id] = ProcessingStatus(
+        file_path=upload_path,
+        chunk_size=chunk_size,
+        export_formats=export_formats
+    )
+    
+    # Start background processing
+    thread = threading.Thread(target=process_file, args=(current_app._get_current_object(), session_id))
+    thread.daemon = True
+    thread.start()
+    
+    return jsonify({
+        'session_id': session_id,
+        'redirect_url': url_for('main.processing', session_id=session_id)
+    })
+
 @bp.route('/quick-analysis', methods=['POST'])
 def quick_analysis():
     """Quick analysis of sample data"""
@@ -67,9 +252,7 @@ def quick_analysis():
             # Save file temporarily
             file = form.file.data
             filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            temp_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"temp_{timestamp}_{filename}")
-            file.save(temp_path)
+            temp_path = save_upload(file.stream, filename, prefix='temp_')
             
             # Analyze sample
             analysis = analyze_sample(temp_path)
@@ -106,51 +289,61 @@ def processing(session_id):
 @bp.route('/api/status/<session_id>')
 def get_status(session_id):
     """Get processing status"""
-    if session_id not in processing_status:
+    status = processing_status.snapshot(session_id, 'status', 'progress', 'message')
+    if status is None:
         return jsonify({'error': 'Sessão não encontrada'}), 404
     
-    status = processing_status[session_id]
-    return jsonify({
-        'status': status['status'],
-        'progress': status['progress'],
-        'message': status['message']
-    })
+    # Unchanged status answers the poll with a bodiless 304
+    etag = hashlib.blake2b(
+        f"{status['status']}|{status['progress']}|{status['message']}".encode(), digest_size=8
+    ).hexdigest()
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(status)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @bp.route('/results/<session_id>')
 def results(session_id):
     """Results page"""
-    if session_id not in processing_status:
+    # Single lookup: the store may evict the session between two separate calls
+    status = processing_status.get(session_id)
+    if status is None:
         return redirect(url_for('main.index'))
     
-    status = processing_status[session_id]
-    if status['status'] != 'completed':
+    if status.status != 'completed':
         return redirect(url_for('main.processing', session_id=session_id))
     
     return render_template('results.html', 
                          session_id=session_id, 
-                         results=status.get('results'),
-                         has_product_groups=status.get('results', {}).get('has_product_groups', False))
+                         results=status.results,
+                         has_product_groups=(status.results or {}).get('has_product_groups', False))
 
 @bp.route('/extraction-analysis/<session_id>')
 def extraction_analysis(session_id):
     """Generate extraction analysis charts"""
-    if session_id not in processing_status:
+    config = processing_status.get(session_id)
+    if config is None:
         flash('Sessão não encontrada.', 'error')
         return redirect(url_for('main.upload'))
     
     try:
-        config = processing_status[session_id]
-        
-        if config.get('status') != 'completed':
+        if config.status != 'completed':
             flash('Processamento não foi concluído.', 'warning')
             return redirect(url_for('main.processing', session_id=session_id))
         
-        if 'results' not in config or 'dataframe' not in config['results']:
+        # The report only reads the group column and the extracted fields
+        processed_df = get_results_frame(
+            session_id,
+            columns=lambda name: name == 'product_group' or name.startswith('extracted_')
+        )
+        if processed_df is None:
             flash('Dados processados não encontrados.', 'error')
             return redirect(url_for('main.results', session_id=session_id))
         
         # Generate extraction analysis
-        processed_df = config['results']['dataframe']
         visualizer = GroupBasedDataVisualizer(product_group_manager)
         report = visualizer.generate_extraction_report(processed_df, 'product_group')
         
@@ -169,20 +362,18 @@ def extraction_analysis(session_id):
 @bp.route('/download/<session_id>/<format>')
 def download(session_id, format):
     """Download processed files"""
-    if session_id not in processing_status:
+    status = processing_status.get(session_id)
+    if status is None:
         return jsonify({'error': 'Sessão não encontrada'}), 404
     
-    status = processing_status[session_id]
-    if status['status'] != 'completed':
+    if status.status != 'completed':
         return jsonify({'error': 'Processamento não concluído'}), 400
     
     # Find and serve the requested file
-    if 'results' in status and 'download_info' in status['results']:
-        for file_info in status['results']['download_info']['files']:
-            if file_info['format'].lower() == format.lower():
-                file_path = file_info['path']
-                if os.path.exists(file_path):
-                    return send_file(file_path, as_attachment=True)
+    download_info = (status.results or {}).get('download_info') or {}
+    file_info = download_info.get('files_by_format', {}).get(format.lower())
+    if file_info and os.path.exists(file_info['path']):
+        return send_file(file_info['path'], as_attachment=True)
     
     return jsonify({'error': 'Arquivo não encontrado'}), 404
 # Add this new route after the existing download route in app/routes.py
@@ -190,16 +381,16 @@ def download(session_id, format):
 @bp.route('/download/<session_id>/<format>/<group_key>')
 def download_group(session_id, format, group_key):
     """Download files for specific product group"""
-    if session_id not in processing_status:
+    status = processing_status.get(session_id)
+    if status is None:
         return jsonify({'error': 'Sessão não encontrada'}), 404
     
-    status = processing_status[session_id]
-    if status['status'] != 'completed':
+    if status.status != 'completed':
         return jsonify({'error': 'Processamento não concluído'}), 400
     
     # Find and serve the requested group file
-    if 'results' in status and 'download_info' in status['results']:
-        for file_info in status['results']['download_info']['files']:
+    if status.results and status.results.get('download_info'):
+        for file_info in status.results['download_info']['files']:
             if (file_info['format'].lower() == format.lower() and 
                 file_info.get('product_group') == group_key):
                 file_path = file_info['path']
@@ -212,142 +403,307 @@ def download_group(session_id, format, group_key):
 # PROCESSING FUNCTIONS
 # ===============================
 
+def save_upload(stream, filename, prefix=''):
+    """Write an uploaded stream into the upload folder in 1 MB blocks and return its path"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{prefix}{timestamp}_{filename}")
+    try:
+        with open(upload_path, 'wb') as out:
+            shutil.copyfileobj(stream, out, 1 << 20)
+    except:
+        # A broken stream or a body over MAX_CONTENT_LENGTH (werkzeug raises 413 while
+        # reading) must not leave a partial file behind
+        try:
+            os.remove(upload_path)
+        except OSError:
+            pass
+        raise
+    return upload_path
+
+def get_job_executor():
+    """Process pool shared by all upload sessions (created on first use)"""
+    global _job_executor, _job_manager
+    with _job_executor_lock:
+        if _job_executor is None:
+            # spawn: forking a threaded Flask server process is unsafe
+            mp_context = multiprocessing.get_context('spawn')
+            _job_executor = ProcessPoolExecutor(max_workers=MAX_JOB_WORKERS, mp_context=mp_context)
+            if _job_manager is None:
+                _job_manager = mp_context.Manager()
+        return _job_executor, _job_manager
+
+def reset_job_executor(executor):
+    """Drop a broken process pool so the next job creates a fresh one"""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is executor:
+            _job_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
 def process_file(app, session_id):
-    """Background file processing with product group support - MANDATORY FIELDS ONLY"""
+    """Supervise a processing job: run it in the process pool and relay its progress"""
     config = processing_status[session_id]
     
     def update_progress(message, progress=None):
-        config['message'] = message
-        if progress is not None:
-            config['progress'] = progress
-        print(f"📊 {message}")
+        if progress is None:
+            processing_status.update(session_id, message=message)
+        else:
+            processing_status.update(session_id, message=message, progress=progress)
     
-    with app.app_context():
+    try:
+        executor, manager = get_job_executor()
+        progress_queue = manager.Queue()
+        job = {
+            'file_path': config.file_path,
+            'chunk_size': config.chunk_size,
+            'export_formats': config.export_formats,
+            'download_folder': app.config['DOWNLOAD_FOLDER']
+        }
+        future = executor.submit(run_processing_job, job, progress_queue)
+        
+        # Drain progress updates until the job finishes and the queue is empty
+        while True:
+            try:
+                update_progress(*progress_queue.get(timeout=0.5))
+            except queue.Empty:
+                if future.done():
+                    break
+        
+        session_results = future.result()
+        
+        # Store results with enhanced download info
+        processing_status.update(
+            session_id,
+            results=session_results,
+            progress=100,
+            message='Processamento concluído com sucesso! Exportados apenas campos obrigatórios + ID + hosting type.',
+            status='completed',
+            finished_at=time.monotonic()
+        )
+        
+        # Clean up uploaded file
         try:
-            update_progress("Carregando arquivo...", 10)
-            
-            # Initialize processor
-            processor = GroupBasedDataProcessor(chunk_size=config['chunk_size'])
-            
-            # Process CSV by groups
-            results = processor.process_csv_by_groups(
-                config['file_path'],
-                obs_column='obs',
-                product_group_column='product_group',
-                enable_cleaning=True,
-                enable_extraction=True,
-                progress_callback=update_progress
-            )
-            
-            if not results['success']:
-                raise Exception(f"Processamento falhou: {'; '.join(results.get('errors', []))}")
-            
-            update_progress("Exportando arquivos (apenas campos obrigatórios)...", 85)
-            
-            # CRITICAL: Ensure ID and hosting_type columns are preserved
-            processed_df = results['dataframe']
-            
-            # Log what columns we have before export
-            print(f"🔍 Columns in processed dataframe: {list(processed_df.columns)}")
-            
-            # Check for ID and hosting_type columns (case insensitive)
-            id_columns = [col for col in processed_df.columns if col.lower() in ['id', 'identifier']]
-            hosting_columns = [col for col in processed_df.columns if 'hosting' in col.lower() and 'type' in col.lower()]
-            
-            print(f"🔍 Found ID columns: {id_columns}")
-            print(f"🔍 Found hosting type columns: {hosting_columns}")
-            
-            # Export files with MANDATORY FIELDS ONLY
-            download_folder = current_app.config['DOWNLOAD_FOLDER']
-            exporter = EnhancedExportHandler()
-            filename_base = f"mandatory_fields_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            # Handle export formats
-            export_formats = []
-            if config['export_formats'] == 'both':
-                export_formats = ['csv', 'excel']
-            elif config['export_formats'] == 'all':
-                export_formats = ['csv', 'excel', 'json']
-            else:
-                export_formats = [config['export_formats']]
-            
-            # Export with MANDATORY FIELDS ONLY - pass the group manager
-            export_results = exporter.export_data(
-                dataframe=processed_df,
-                output_dir=download_folder,
-                filename_base=filename_base,
-                formats=export_formats,
-                product_group_manager=processor.group_manager  # Pass the group manager
-            )
-            
-            if not export_results['success']:
-                raise Exception(f"Exportação falhou: {'; '.join(export_results.get('errors', []))}")
-            
-            update_progress("Processamento concluído! Apenas campos obrigatórios exportados.", 100)
-            
-            # Store results with enhanced download info
-            config.update({
-                'status': 'completed',
-                'progress': 100,
-                'message': 'Processamento concluído com sucesso! Exportados apenas campos obrigatórios + ID + hosting type.',
-                'results': {
-                    'stats': results['stats'],
-                    'dataframe': processed_df,
-                    'download_info': exporter.create_download_info(export_results),
-                    'has_product_groups': 'product_group' in processed_df.columns and processor.group_manager is not None,
-                    'export_type': 'mandatory_fields_only'
-                }
-            })
+            os.remove(config.file_path)
+        except:
+            pass
             
-            # Clean up uploaded file
-            try:
-                os.remove(config['file_path'])
-            except:
-                pass
-                
-        except Exception as e:
-            error_msg = f"Erro: {str(e)}"
-            print(f"❌ {error_msg}")
-            config.update({
-                'status': 'error',
-                'message': error_msg
-            })
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for running out of memory): the pool can't take
+        # new jobs, so replace it before the next upload
+        reset_job_executor(executor)
+        error_msg = "Erro: o processo de processamento foi encerrado inesperadamente"
+        print(f"❌ {error_msg}")
+        processing_status.update(session_id, message=error_msg, status='error', finished_at=time.monotonic())
+    except Exception as e:
+        error_msg = f"Erro: {str(e)}"
+        print(f"❌ {error_msg}")
+        processing_status.update(session_id, message=error_msg, status='error', finished_at=time.monotonic())
+
+def run_processing_job(job, progress_queue):
+    """Background file processing with product group support - MANDATORY FIELDS ONLY
+    
+    Runs in a worker process (no Flask app or request context); progress updates
+    are sent back to the supervising thread through progress_queue.
+    """
+    def update_progress(message, progress=None):
+        progress_queue.put((message, progress))
+        print(f"📊 {message}")
+    
+    update_progress("Carregando arquivo...", 10)
+    
+    # Initialize processor
+    processor = GroupBasedDataProcessor(chunk_size=job['chunk_size'])
+    
+    # Process CSV by groups
+    results = processor.process_csv_by_groups(
+        job['file_path'],
+        obs_column='obs',
+        product_group_column='product_group',
+        enable_cleaning=True,
+        enable_extraction=True,
+        progress_callback=update_progress
+    )
+    
+    if not results['success']:
+        raise Exception(f"Processamento falhou: {'; '.join(results.get('errors', []))}")
+    
+    update_progress("Exportando arquivos (apenas campos obrigatórios)...", 85)
+    
+    # CRITICAL: Ensure ID and hosting_type columns are preserved
+    processed_df = results['dataframe']
+    
+    # Log what columns we have before export
+    print(f"🔍 Columns in processed dataframe: {list(processed_df.columns)}")
+    
+    # Check for ID and hosting_type columns (case insensitive)
+    id_columns = [col for col in processed_df.columns if col.lower() in ['id', 'identifier']]
+    hosting_columns = [col for col in processed_df.columns if 'hosting' in col.lower() and 'type' in col.lower()]
+    
+    print(f"🔍 Found ID columns: {id_columns}")
+    print(f"🔍 Found hosting type columns: {hosting_columns}")
+    
+    # Export files with MANDATORY FIELDS ONLY
+    download_folder = job['download_folder']
+    exporter = EnhancedExportHandler()
+    filename_base = f"mandatory_fields_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    # Handle export formats
+    export_formats = []
+    if job['export_formats'] == 'both':
+        export_formats = ['csv', 'excel']
+    elif job['export_formats'] == 'all':
+        export_formats = ['csv', 'excel', 'json']
+    else:
+        export_formats = [job['export_formats']]
+    
+    # Export with MANDATORY FIELDS ONLY - pass the group manager
+    export_results = exporter.export_data(
+        dataframe=processed_df,
+        output_dir=download_folder,
+        filename_base=filename_base,
+        formats=export_formats,
+        product_group_manager=processor.group_manager  # Pass the group manager
+    )
+    
+    if not export_results['success']:
+        raise Exception(f"Exportação falhou: {'; '.join(export_results.get('errors', []))}")
+    
+    # Persist processed dataframe as Arrow IPC so it doesn't stay resident per session
+    session_results = {
+        'stats': results['stats'],
+        'download_info': exporter.create_download_info(export_results),
+        'has_product_groups': 'product_group' in processed_df.columns and processor.group_manager is not None,
+        'export_type': 'mandatory_fields_only'
+    }
+    dataframe_path = os.path.join(download_folder, f"{filename_base}.arrow")
+    try:
+        processed_df.reset_index(drop=True).to_feather(dataframe_path, compression='uncompressed')
+        session_results['dataframe_path'] = dataframe_path
+    except Exception as e:
+        print(f"⚠️ Não foi possível salvar dataframe em disco, mantendo em memória: {str(e)}")
+        session_results['dataframe'] = processed_df
+    
+    # Drop this worker's references to the processed frame before returning
+    # (pandas frames can sit in reference cycles until a full collection)
+    results.pop('dataframe', None)
+    del processed_df, processor
+    gc.collect()
+    
+    update_progress("Processamento concluído! Apenas campos obrigatórios exportados.", 100)
+    
+    return session_results
+
+def load_results_dataframe(results, columns=None):
+    """Lazily load the processed dataframe persisted for a session.
+    
+    columns may be a list of column names or a predicate on the column name;
+    only the selected columns are converted to pandas.
+    """
+    if columns is None:
+        keep = None
+    elif callable(columns):
+        keep = columns
+    else:
+        wanted = set(columns)
+        keep = lambda name: name in wanted
+    
+    if 'dataframe' in results:
+        df = results['dataframe']
+        return df if keep is None else df[[col for col in df.columns if keep(col)]]
+    
+    dataframe_path = results.get('dataframe_path')
+    if dataframe_path and os.path.exists(dataframe_path):
+        table = feather.read_table(dataframe_path, memory_map=True)
+        if keep is not None:
+            table = table.select([name for name in table.column_names if keep(name)])
+        return table.to_pandas()
+    
+    return None
+
+def get_results_frame(session_id, columns=None):
+    """Processed dataframe of a completed session (None if unavailable)"""
+    status = processing_status.get(session_id)
+    if status is None or status.status != 'completed' or not status.results:
+        return None
+    return load_results_dataframe(status.results, columns)
+
+def estimate_row_count(file_path, sample_bytes=2 << 20):
+    """Data rows in a CSV: exact if the file fits in the first block, else extrapolated.
+    
+    Returns (row_count, is_exact). Only newlines in the first sample_bytes are
+    counted (raw bytes, no decoding); for larger files the count is scaled by
+    file size, which is enough for the preview heuristics.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        head = f.read(sample_bytes)
+    
+    line_count = head.count(b'\n')
+    if len(head) >= file_size:
+        if head and not head.endswith(b'\n'):
+            line_count += 1
+        return max(line_count - 1, 0), True
+    
+    return max(int(file_size * line_count / len(head)) - 1, 0), False
+
+def count_csv_rows(file_path, column='obs'):
+    """Exact record count from pyarrow's streaming CSV reader.
+    
+    Quoted multi-line values count as one record (unlike a newline count). Only
+    `column` is converted, as raw bytes, so the pass skips type inference and
+    UTF-8 validation.
+    """
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=1 << 20),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(include_columns=[column], column_types={column: pa.binary()})
+    )
+    return sum(batch.num_rows for batch in reader)
 
 def analyze_sample(file_path, sample_size=5000):
     """Analyze sample data for preview"""
-    import re
-    
     try:
-        # Read file info
+        # Validate the header before parsing any rows
+        header = pd.read_csv(file_path, nrows=0).columns
+        if 'obs' not in header:
+            return {
+                'error': f"Coluna 'obs' não encontrada. Colunas disponíveis: {', '.join(header[:10])}"
+            }
+        
+        # Read file info: exact record count, newline estimate if the streaming parse fails
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                total_rows = sum(1 for _ in f) - 1
+            total_rows, rows_exact = count_csv_rows(file_path), True
         except:
-            total_rows = 0
+            try:
+                total_rows, rows_exact = estimate_row_count(file_path)
+            except:
+                total_rows, rows_exact = 0, False
         
-        # Read sample
-        read_size = min(sample_size * 2, total_rows)
-        df = pd.read_csv(file_path, nrows=read_size, low_memory=False)
+        # Read sample (an estimated row count must not cap the sample), parsing only
+        # the columns the preview looks at
+        read_size = min(sample_size * 2, total_rows) if rows_exact else sample_size * 2
+        preview_columns = {'obs', 'product_group', *SAMPLE_COMPLETENESS_COLUMNS}
+        df = pd.read_csv(file_path, nrows=read_size, low_memory=False,
+                         usecols=lambda name: name in preview_columns)
         
-        if 'obs' not in df.columns:
-            return {
-                'error': f"Coluna 'obs' não encontrada. Colunas disponíveis: {', '.join(df.columns[:10])}"
-            }
+        column_set = set(df.columns)
         
         # Check for product groups
-        has_product_groups = 'product_group' in df.columns
+        has_product_groups = 'product_group' in column_set
         product_groups_info = {}
         
         if has_product_groups:
-            for group_key in df['product_group'].dropna().unique():
+            # Row positions per group from a single hash pass (no per-group boolean masks)
+            group_indices = df.groupby('product_group', sort=False, observed=True).indices
+            for group_key, group_idx in group_indices.items():
                 if product_group_manager.is_valid_group(group_key):
                     group_info = product_group_manager.get_group_info(group_key)
-                    group_data = df[df['product_group'] == group_key]
                     mandatory_fields = product_group_manager.get_mandatory_fields(group_key)
                     
                     product_groups_info[group_key] = {
                         'name': group_info['name'],
-                        'record_count': len(group_data),
+                        'record_count': len(group_idx),
                         'mandatory_fields': mandatory_fields,
                         'mandatory_field_count': len(mandatory_fields),
                         'category': group_info.get('category', 'unknown')
@@ -355,44 +711,27 @@ def analyze_sample(file_path, sample_size=5000):
         
         # Basic text analysis
         text_data = df['obs'].astype(str)
+        text_lengths = text_data.str.len()
         text_stats = {
-            'total_mb': round(text_data.str.len().sum() / (1024 * 1024), 2),
-            'avg_length': int(text_data.str.len().mean()),
-            'max_length': int(text_data.str.len().max())
+            'total_mb': round(text_lengths.sum() / (1024 * 1024), 2),
+            'avg_length': int(text_lengths.mean()),
+            'max_length': int(text_lengths.max())
         }
         
         # Quick field detection in 'obs' column
         field_analysis = {}
         sample_texts = text_data.head(100)
         
-        # Look for patterns that match the existing CSV columns
-        field_patterns = {
-            'ip_management': r'IP\s*(?:CPE|management)[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})',
-            'gateway': r'GTW[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})',
-            'ip_block': r'BLOCO\s*IP[:\s]*([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}/\d+)',
-            'vlan': r'VLAN\s*:?\s*(\d+)',
-            'serial_code': r'SN[:\s]*([A-Za-z0-9]+)',
-            'wifi_ssid': r'SSID[:\s]*([A-Za-z0-9_-]+)',
-            'wifi_passcode': r'password[:\s]*([A-Za-z0-9@#$%^&*()_+-=]+)',
-            'asn': r'AS\s*Cliente[:\s]*(\d+)',
-            'mac': r'([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})',
-            'cpe': r'(OLT-[A-Z0-9-]+)',
-            'model_onu': r'ONU[:\s]*([A-Za-z0-9-]+)'
-        }
-        
-        for text in sample_texts:
-            if pd.notna(text) and isinstance(text, str):
-                for field_name, pattern in field_patterns.items():
-                    try:
-                        if re.search(pattern, text, re.IGNORECASE):
-                            field_analysis[field_name] = field_analysis.get(field_name, 0) + 1
-                    except:
-                        continue
+        # One extractall over the sample; a field counts once per text it appears in
+        field_matches = sample_texts.str.extractall(SAMPLE_FIELD_SCAN_REGEX)[list(SAMPLE_FIELD_PATTERNS)]
+        for field_name, match_count in field_matches.notna().groupby(level=0).any().sum().items():
+            if match_count > 0:
+                field_analysis[field_name] = int(match_count)
         
         # Analyze existing column completeness
         existing_completeness = {}
-        for col in ['ip_management', 'gateway', 'ip_block', 'vlan', 'serial_code', 'wifi_ssid', 'wifi_passcode', 'asn', 'mac', 'cpe', 'model_onu']:
-            if col in df.columns:
+        for col in SAMPLE_COMPLETENESS_COLUMNS:
+            if col in column_set:
                 filled_count = df[col].notna().sum()
                 total_count = len(df)
                 existing_completeness[col] = {
@@ -405,6 +744,7 @@ def analyze_sample(file_path, sample_size=5000):
             'sample_info': {
                 'actual_size': len(df),
                 'total_file_rows': total_rows,
+                'total_rows_estimated': not rows_exact,
                 'column_name': 'obs',
                 'has_product_groups': has_product_groups,
                 'product_groups_info': product_groups_info
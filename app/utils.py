@@ -1,27 +1,42 @@
 import os
-import pandas as pd
-from datetime import datetime
+import time
+import csv
+import itertools
 from werkzeug.utils import secure_filename
 
+FILE_SIZE_UNITS = ("B", "KB", "MB", "GB")
+
+# csv's default 128 KB field limit is far below what pandas accepts for an 'obs'
+# cell; 2**31 - 1 is the largest limit every platform's C long can hold
+CSV_FIELD_SIZE_LIMIT = 2**31 - 1
+
 def generate_unique_filename(original_filename):
     """Generate unique filename with timestamp"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    secure_name = secure_filename(original_filename)
-    name, ext = os.path.splitext(secure_name)
-    return f"{timestamp}_{name}{ext}"
+    # Stem and extension are rejoined unchanged, so no split is needed
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    return f"{timestamp}_{secure_filename(original_filename)}"
 
 def validate_csv_file(filepath, required_column=None):
-    """Validate CSV file"""
+    """Validate CSV file (header plus the first rows, read with the csv module)"""
+    previous_field_limit = csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
     try:
-        sample_df = pd.read_csv(filepath, nrows=5)
+        # Strict decoding: a file that isn't UTF-8 is reported, as with pd.read_csv
+        with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            columns = next(reader, None)
+            if columns is None:
+                raise ValueError("No columns to parse from file")
+            # Parse a few rows so malformed quoting is still reported
+            for _ in itertools.islice(reader, 5):
+                pass
         
         result = {
             'valid': True,
-            'columns': list(sample_df.columns),
+            'columns': columns,
             'errors': []
         }
         
-        if required_column and required_column not in sample_df.columns:
+        if required_column and required_column not in columns:
             result['valid'] = False
             result['errors'].append(f"Column '{required_column}' not found")
         
@@ -32,39 +47,31 @@ def validate_csv_file(filepath, required_column=None):
             'valid': False,
             'errors': [str(e)]
         }
+    finally:
+        csv.field_size_limit(previous_field_limit)
 
 def format_file_size(size_bytes):
     """Format file size in human readable format"""
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    
-    return f"{size_bytes:.1f} {size_names[i]}"
+    # 1024 == 2**10: the unit index is the bit length in steps of 10
+    i = min(max(int(size_bytes).bit_length() - 1, 0) // 10, len(FILE_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * i)):.1f} {FILE_SIZE_UNITS[i]}"
 
 def cleanup_old_files(directory, max_age_hours=24):
     """Clean up old files"""
-    if not os.path.exists(directory):
-        return 0
-    
-    current_time = datetime.now()
+    # Compare raw epoch seconds; scandir entries carry their stat result
+    cutoff = time.time() - max_age_hours * 3600
     files_removed = 0
     
     try:
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            
-            if os.path.isfile(file_path):
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                age_hours = (current_time - file_time).total_seconds() / 3600
-                
-                if age_hours > max_age_hours:
+        # A missing directory raises here and is reported as nothing removed
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
                     try:
-                        os.remove(file_path)
+                        os.remove(entry.path)
                         files_removed += 1
                     except:
                         pass
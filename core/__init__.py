@@ -3,4 +3,4 @@ from .text_extractor import EnhancedTelecomTextExtractor
 from .text_cleaner import EnhancedTelecomTextCleaner
 from .export_handler import EnhancedExportHandler
 
-__all__ = ['EnhancedTelecomDataProcessor', 'EnhancedTelecomTextExtractor', 'EnhancedTelecomTextCleaner', 'EnhancedExportHandler']
\ No newline at end of file
+__all__ = ('EnhancedTelecomDataProcessor', 'EnhancedTelecomTextExtractor', 'EnhancedTelecomTextCleaner', 'EnhancedExportHandler')
\ No newline at end of file
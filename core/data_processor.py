@@ -6,10 +6,36 @@ Main processor that orchestrates group-based cleaning and extraction
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+from core.product_groups import product_group_manager as default_product_group_manager
+from core.text_cleaner import GroupBasedTextCleaner
+from core.text_extractor import GroupBasedTextExtractor
+
+# Byte-order marks and the encoding they imply (UTF-32 first: its LE mark starts
+# with the UTF-16 LE one). A UTF-8 BOM is skipped by the readers themselves.
+BOM_ENCODINGS = (
+    (b'\xff\xfe\x00\x00', 'utf-32'),
+    (b'\x00\x00\xfe\xff', 'utf-32'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+
 class GroupBasedDataProcessor:
     """
     Enhanced data processor focused on product group classification
@@ -19,17 +45,10 @@ class GroupBasedDataProcessor:
     def __init__(self, chunk_size=5000, product_group_manager=None):
         self.chunk_size = chunk_size
         
-        # Import dependencies with product group manager
-        if product_group_manager:
-            self.group_manager = product_group_manager
-        else:
-            from core.product_groups import product_group_manager
-            self.group_manager = product_group_manager
+        # Use the given product group manager, or the shared default one
+        self.group_manager = product_group_manager or default_product_group_manager
         
         # Initialize processors with group manager
-        from core.text_cleaner import GroupBasedTextCleaner
-        from core.text_extractor import GroupBasedTextExtractor
-        
         self.cleaner = GroupBasedTextCleaner(self.group_manager)
         self.extractor = GroupBasedTextExtractor(self.group_manager)
         
@@ -52,7 +71,7 @@ class GroupBasedDataProcessor:
         """
         Process CSV file with group-based optimization
         """
-        start_time = datetime.now()
+        start_time = time.monotonic()
         
         def update_progress(message, progress=None):
             if progress_callback:
@@ -95,10 +114,9 @@ class GroupBasedDataProcessor:
             # Step 6: Final cleanup and summary
             df = self._finalize_group_processing(df, product_group_column)
             
-            # Calculate processing time
-            end_time = datetime.now()
-            processing_time = end_time - start_time
-            self.stats['processing_time'] = str(processing_time).split('.')[0]
+            # Calculate processing time (monotonic: immune to wall-clock adjustments)
+            processing_time = timedelta(seconds=int(time.monotonic() - start_time))
+            self.stats['processing_time'] = str(processing_time)
             self.stats['processed_rows'] = len(df)
             
             update_progress("Processamento baseado em grupos concluído com sucesso!", 100)
@@ -128,20 +146,69 @@ class GroupBasedDataProcessor:
         """
         Load CSV and validate required columns with encoding detection
         """
-        if not os.path.exists(file_path):
+        # Single stat: existence check plus the size used to bound the encoding sniff
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
         
-        # Try multiple encodings
-        encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
-        
         df = None
-        for encoding in encodings:
+        
+        # First 64 KB, read once: BOM sniff here, encoding detection below
+        with open(file_path, 'rb') as f:
+            head = f.read(min(file_size, 65536))
+        bom_encoding = next((encoding for bom, encoding in BOM_ENCODINGS if head.startswith(bom)), 'utf-8')
+        
+        # Fast path: multi-threaded pyarrow reader for UTF-8 (BOM or not) and BOM-marked UTF-16/32
+        if pacsv is not None:
             try:
-                df = pd.read_csv(file_path, encoding=encoding, low_memory=False)
-                print(f"✅ CSV carregado com codificação {encoding}")
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+                read_options = pacsv.ReadOptions(encoding=bom_encoding, use_threads=True)
+                parse_options = pacsv.ParseOptions(newlines_in_values=True)
+                # Match pd.read_csv: empty cells become NaN
+                convert_options = pacsv.ConvertOptions(strings_can_be_null=True,
+                                                       quoted_strings_can_be_null=True)
+                
+                # Arrow infers ISO dates/times from the first block while pandas keeps
+                # them as text: read any column inferred as temporal as a string
+                schema = pacsv.open_csv(file_path, read_options=read_options, parse_options=parse_options,
+                                        convert_options=convert_options).schema
+                convert_options.column_types = {field.name: pa.string() for field in schema
+                                                if pa.types.is_temporal(field.type)}
+                
+                table = pacsv.read_csv(file_path, read_options=read_options,
+                                       parse_options=parse_options, convert_options=convert_options)
+                df = table.to_pandas(self_destruct=True, split_blocks=True)
+                del table
+                print(f"✅ CSV carregado com pyarrow ({bom_encoding})")
+            except (pa.ArrowInvalid, UnicodeError):
+                # Transcoded (UTF-16/32) reads can report bad bytes as UnicodeError
+                df = None
+        
+        # Detect the encoding once from the first 64 KB and parse a single time
+        if df is None and charset_normalizer is not None:
+            try:
+                best_match = charset_normalizer.from_bytes(head).best()
+                encoding = best_match.encoding if best_match else 'utf-8'
+                df = pd.read_csv(file_path, encoding=encoding, engine='c', low_memory=False)
+                print(f"✅ CSV carregado com codificação detectada {encoding}")
+            except (UnicodeDecodeError, UnicodeError, LookupError):
+                df = None
+        
+        # Fall back to trying multiple encodings (after a failed detection only latin-1
+        # is left to try: it decodes any byte sequence)
+        if df is None:
+            if charset_normalizer is not None:
+                encodings = ['latin-1']
+            else:
+                encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
+            
+            for encoding in encodings:
+                try:
+                    df = pd.read_csv(file_path, encoding=encoding, low_memory=False)
+                    print(f"✅ CSV carregado com codificação {encoding}")
+                    break
+                except (UnicodeDecodeError, UnicodeError):
+                    continue
         
         if df is None:
             raise Exception("Não foi possível carregar o CSV com nenhuma codificação suportada")
@@ -403,11 +470,11 @@ class GroupBasedDataProcessor:
         """
         quality_metrics = {}
         
-        for group_key in df[product_group_column].unique():
-            if pd.isna(group_key):
-                continue
-                
-            group_data = df[df[product_group_column] == group_key]
+        # Row positions per group from a single hash pass (NaN groups are dropped)
+        group_indices = df.groupby(product_group_column, sort=False, observed=True).indices
+        
+        for group_key, group_idx in group_indices.items():
+            group_data = df.iloc[group_idx]
             group_name = self.group_manager.get_group_display_name(group_key)
             
             # Calculate quality score based on multiple factors
@@ -531,6 +598,10 @@ class GroupBasedDataProcessor:
             # Add group-specific summary columns
             self._add_group_summary_columns(df, product_group_column)
             
+            # Store product group as category: exports and analyses group/filter on it repeatedly
+            if product_group_column in df.columns:
+                df[product_group_column] = df[product_group_column].astype('category')
+            
             print(f"✅ Finalização concluída. Forma final: {df.shape}")
             return df
             
@@ -571,23 +642,15 @@ class GroupBasedDataProcessor:
                             mandatory_rate = (mandatory_filled / len(mandatory_cols) * 100).round(2)
                             df.loc[group_mask, 'mandatory_completeness'] = mandatory_rate
             
-            # Add group validation flags
-            df['valid_product_group'] = df[product_group_column].apply(
-                lambda x: self.group_manager.is_valid_group(x) if pd.notna(x) else False
-            )
-            
-            # Add quality indicators
-            df['processing_quality'] = 'unknown'
+            # Add group validation flags (hashed membership, no per-row Python call)
+            df['valid_product_group'] = df[product_group_column].isin(self.group_manager.get_all_groups())
             
-            for group_key in df[product_group_column].unique():
-                if pd.isna(group_key):
-                    continue
-                    
-                group_mask = df[product_group_column] == group_key
-                
-                if group_key in self.stats['quality_metrics']:
-                    quality_grade = self.stats['quality_metrics'][group_key]['quality_grade']
-                    df.loc[group_mask, 'processing_quality'] = quality_grade
+            # Add quality indicators: each row takes its group's grade in one mapping pass
+            quality_grades = {
+                group_key: metrics['quality_grade']
+                for group_key, metrics in self.stats['quality_metrics'].items()
+            }
+            df['processing_quality'] = df[product_group_column].map(quality_grades).fillna('unknown')
                 
         except Exception as e:
             self.stats['warnings'].append(f"Erro ao adicionar colunas de resumo: {str(e)}")
@@ -691,15 +754,19 @@ class GroupBasedDataProcessor:
         Preview group-based processing on a small sample
         """
         try:
-            # Read small sample
-            df_sample = pd.read_csv(file_path, nrows=sample_size*10)  # Read extra to ensure we have enough per group
+            # Check the header first so missing columns keep their own message
+            header = pd.read_csv(file_path, nrows=0).columns
             
-            if obs_column not in df_sample.columns:
+            if obs_column not in header:
                 return {'error': f"Coluna '{obs_column}' não encontrada"}
             
-            if product_group_column not in df_sample.columns:
+            if product_group_column not in header:
                 return {'error': f"Coluna '{product_group_column}' não encontrada"}
             
+            # Read small sample of just the two columns the preview uses
+            df_sample = pd.read_csv(file_path, nrows=sample_size*10,  # Read extra to ensure we have enough per group
+                                    usecols=[obs_column, product_group_column])
+            
             # Group the sample and take representative samples
             preview_results = []
             
@@ -709,11 +776,11 @@ class GroupBasedDataProcessor:
                 group_info = self.group_manager.get_group_info(group_key)
                 group_name = group_info['name'] if group_info else group_key
                 mandatory_fields = self.group_manager.get_mandatory_fields(group_key)
+                group_category = self.group_manager.get_group_category(group_key)
+                group_priority = self.group_manager.get_group_priority_level(group_key)
                 
-                for idx, row in group_data.iterrows():
-                    text = row[obs_column]
-                    
-                    if pd.isna(text) or not isinstance(text, str):
+                for text in group_data[obs_column].to_numpy():
+                    if not isinstance(text, str):
                         continue
                     
                     # Preview cleaning
@@ -722,20 +789,23 @@ class GroupBasedDataProcessor:
                     
                     # Preview mandatory field extraction
                     mandatory_extracted = self.extractor.extract_mandatory_fields_only(cleaned_text, group_key)
-                    mandatory_success = sum(1 for v in mandatory_extracted.values() if v is not None)
+                    
+                    # Extracted values and their count from a single pass
+                    sample_extractions = {k: v for k, v in mandatory_extracted.items() if v is not None}
+                    mandatory_success = len(sample_extractions)
                     
                     preview_results.append({
                         'group_key': group_key,
                         'group_name': group_name,
-                        'group_category': self.group_manager.get_group_category(group_key),
-                        'group_priority': self.group_manager.get_group_priority_level(group_key),
+                        'group_category': group_category,
+                        'group_priority': group_priority,
                         'original_length': len(text),
                         'cleaned_length': len(cleaned_text),
                         'cleaning_reduction': cleaning_stats.get('reduction_percent', 0),
                         'mandatory_fields_total': len(mandatory_fields),
                         'mandatory_fields_extracted': mandatory_success,
                         'mandatory_completeness': round((mandatory_success / len(mandatory_fields) * 100), 2) if mandatory_fields else 0,
-                        'sample_extractions': {k: v for k, v in mandatory_extracted.items() if v is not None}
+                        'sample_extractions': sample_extractions
                     })
             
             return {
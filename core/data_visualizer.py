@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import io
 import base64
+import traceback
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -83,12 +84,11 @@ class GroupBasedDataVisualizer:
             print("🔍 DEBUG: No extracted columns found!")
             return {}
         
-        for group in df[group_column].unique():
-            if pd.isna(group):
-                continue
-                
+        group_indices = df.groupby(group_column, sort=False, observed=True).indices
+        
+        for group, group_idx in group_indices.items():
             print(f"🔍 DEBUG: Processing group: {group}")
-            group_data = df[df[group_column] == group]
+            group_data = df.iloc[group_idx]
             group_info = self.group_manager.get_group_info(group)
             
             if not group_info:
@@ -102,13 +102,20 @@ class GroupBasedDataVisualizer:
             field_stats = {}
             total_extractions = 0
             
+            # Non-null counts for all present mandatory columns from one NA mask
+            present_cols = [f'extracted_{field}' for field in mandatory_fields if f'extracted_{field}' in group_data.columns]
+            non_null_counts = dict(zip(
+                present_cols,
+                np.count_nonzero(~pd.isna(group_data[present_cols].to_numpy()), axis=0)
+            ))
+            
             for field in mandatory_fields:
                 field_col = f'extracted_{field}'
                 print(f"   Checking field: {field} -> column: {field_col}")
                 
-                if field_col in group_data.columns:
+                if field_col in non_null_counts:
                     # Count non-null AND non-empty values
-                    non_null_count = group_data[field_col].notna().sum()
+                    non_null_count = non_null_counts[field_col]
                     non_empty_count = group_data[field_col].astype(str).str.strip().ne('').sum()
                     
                     extracted_count = non_empty_count  # Use non-empty count
@@ -272,7 +279,6 @@ class GroupBasedDataVisualizer:
             
         except Exception as e:
             print(f"❌ Error creating mandatory field chart: {e}")
-            import traceback
             print(traceback.format_exc())
             return None
     
@@ -328,16 +334,24 @@ class GroupBasedDataVisualizer:
         if not extraction_data:
             return {}
         
-        total_records = sum(data['total_records'] for data in extraction_data.values())
-        total_extractions = sum(data['total_extractions'] for data in extraction_data.values())
-        success_rates = [data['overall_success_rate'] for data in extraction_data.values()]
+        # Single pass over the groups: totals, success rate sum and best group together
+        total_records = 0
+        total_extractions = 0
+        success_rate_sum = 0
+        best_group = None
+        for data in extraction_data.values():
+            total_records += data['total_records']
+            total_extractions += data['total_extractions']
+            success_rate_sum += data['overall_success_rate']
+            if best_group is None or data['overall_success_rate'] > best_group['overall_success_rate']:
+                best_group = data
         
         return {
             'total_groups': len(extraction_data),
             'total_records': total_records,
             'total_extractions': total_extractions,
-            'average_success_rate': round(np.mean(success_rates), 1) if success_rates else 0,
-            'best_group': max(extraction_data.items(), key=lambda x: x[1]['overall_success_rate'])[1]['name'] if extraction_data else '',
+            'average_success_rate': round(success_rate_sum / len(extraction_data), 1),
+            'best_group': best_group['name'],
             'extraction_efficiency': round((total_extractions / total_records) * 100, 1) if total_records > 0 else 0
         }
     
@@ -6,12 +6,24 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class EnhancedExportHandler:
     """Enhanced export handler with product group separation - MANDATORY FIELDS ONLY"""
     
     def __init__(self):
         self.max_cell_length = 32000
     
+    def _file_size(self, path):
+        """Size of a written export file, or None if it doesn't exist (one stat call)"""
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return None
+    
     def export_data(self, dataframe, output_dir, filename_base, formats=['csv', 'excel'], product_group_manager=None):
         """Enhanced export with product group separation - MANDATORY FIELDS + ID + HOSTING TYPE ONLY"""
         result = {
@@ -82,12 +94,14 @@ class EnhancedExportHandler:
             mandatory_fields = product_group_manager.get_mandatory_fields(group_key)
             print(f"   Mandatory fields for {group_key}: {mandatory_fields}")
             
+            # Rows of this group, selected once for all of its fields
+            group_data = dataframe[dataframe['product_group'] == group_key] if 'product_group' in dataframe.columns else dataframe
+            
             # Add only the extracted versions of mandatory fields that actually exist and have data
             for field in mandatory_fields:
                 extracted_field = f'extracted_{field}'
                 if extracted_field in dataframe.columns:
                     # Check if this field has any non-null data in this group
-                    group_data = dataframe[dataframe['product_group'] == group_key] if 'product_group' in dataframe.columns else dataframe
                     if group_data[extracted_field].notna().any():
                         mandatory_columns.append(extracted_field)
                         print(f"      Including {extracted_field} (has data)")
@@ -100,11 +114,8 @@ class EnhancedExportHandler:
                 if dataframe[col].notna().any():
                     mandatory_columns.append(col)
         
-        # Remove duplicates while preserving order
-        unique_columns = []
-        for col in mandatory_columns:
-            if col not in unique_columns:
-                unique_columns.append(col)
+        # Remove duplicates while preserving order (hashed membership via dict keys)
+        unique_columns = list(dict.fromkeys(mandatory_columns))
         
         print(f"   Final columns for export: {unique_columns}")
         return unique_columns
@@ -148,12 +159,13 @@ class EnhancedExportHandler:
             
             mandatory_only_df.to_csv(csv_path, index=False, encoding='utf-8-sig')
             
-            if os.path.exists(csv_path):
+            csv_size = self._file_size(csv_path)
+            if csv_size is not None:
                 result['files_created'].append({
                     'format': 'csv',
                     'path': csv_path,
                     'filename': csv_filename,
-                    'size': os.path.getsize(csv_path),
+                    'size': csv_size,
                     'description': 'Apenas campos obrigatórios + ID + hosting type'
                 })
                 print(f"✅ CSV (mandatory only): {csv_path}")
@@ -209,12 +221,13 @@ class EnhancedExportHandler:
                 # Create mandatory field mapping sheet
                 self._create_mandatory_field_mapping_sheet(dataframe, product_group_manager, writer)
             
-            if os.path.exists(excel_path):
+            excel_size = self._file_size(excel_path)
+            if excel_size is not None:
                 result['files_created'].append({
                     'format': 'excel',
                     'path': excel_path,
                     'filename': excel_filename,
-                    'size': os.path.getsize(excel_path),
+                    'size': excel_size,
                     'description': 'Excel com planilhas por grupo - apenas campos obrigatórios + ID + hosting type'
                 })
                 print(f"✅ Excel (mandatory by groups): {excel_path}")
@@ -261,12 +274,13 @@ class EnhancedExportHandler:
                     summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
                     summary_df.to_excel(writer, sheet_name='Summary', index=False)
             
-            if os.path.exists(excel_path):
+            excel_size = self._file_size(excel_path)
+            if excel_size is not None:
                 result['files_created'].append({
                     'format': 'excel',
                     'path': excel_path,
                     'filename': excel_filename,
-                    'size': os.path.getsize(excel_path),
+                    'size': excel_size,
                     'description': 'Apenas campos obrigatórios + ID + hosting type'
                 })
                 print(f"✅ Excel (mandatory only): {excel_path}")
@@ -346,16 +360,21 @@ class EnhancedExportHandler:
             json_filename = f"bibliotecario_mandatory_fields_{timestamp}.json"
             json_path = os.path.join(export_folder, json_filename)
             
-            # Write JSON
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            # Write JSON (orjson encodes straight to UTF-8 bytes in C when available)
+            if orjson is not None:
+                with open(json_path, 'wb') as f:
+                    f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(json_data, f, ensure_ascii=False, indent=2)
             
-            if os.path.exists(json_path):
+            json_size = self._file_size(json_path)
+            if json_size is not None:
                 result['files_created'].append({
                     'format': 'json',
                     'path': json_path,
                     'filename': json_filename,
-                    'size': os.path.getsize(json_path),
+                    'size': json_size,
                     'description': 'Apenas campos obrigatórios + ID + hosting type'
                 })
                 print(f"✅ JSON (mandatory only): {json_path}")
@@ -512,6 +531,7 @@ class EnhancedExportHandler:
         
         download_info = {
             'files': [],
+            'files_by_format': {},
             'total_files': len(export_results['files_created']),
             'timestamp': datetime.now().isoformat(),
             'export_type': 'mandatory_fields_only'
@@ -530,6 +550,9 @@ class EnhancedExportHandler:
                 download_entry['description'] = file_info['description']
             
             download_info['files'].append(download_entry)
+            
+            # Index by lowercase format for O(1) lookup in the download route
+            download_info['files_by_format'].setdefault(download_entry['format'].lower(), download_entry)
         
         return download_info
 
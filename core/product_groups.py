@@ -415,9 +415,9 @@ class ProductGroupManager:
                 if extracted_field in dataframe.columns:
                     # Check if this field has meaningful data in this group
                     field_data = group_data[extracted_field].dropna()
-                    # Remove empty strings and 'nan' values
-                    meaningful_data = field_data[field_data.astype(str).str.strip() != '']
-                    meaningful_data = meaningful_data[meaningful_data.astype(str).str.lower() != 'nan']
+                    # Remove empty strings and 'nan' values (cast to str once)
+                    field_text = field_data.astype(str)
+                    meaningful_data = field_data[(field_text.str.strip() != '') & (field_text.str.lower() != 'nan')]
                     
                     if len(meaningful_data) > 0:
                         export_columns.append(extracted_field)
@@ -425,11 +425,8 @@ class ProductGroupManager:
                     else:
                         print(f"   ❌ Skipping {extracted_field}: no meaningful data")
         
-        # Remove duplicates while preserving order
-        unique_columns = []
-        for col in export_columns:
-            if col not in unique_columns:
-                unique_columns.append(col)
+        # Remove duplicates while preserving order (hashed membership via dict keys)
+        unique_columns = list(dict.fromkeys(export_columns))
         
         print(f"📤 Final export columns for {group_key}: {unique_columns}")
         return unique_columns
@@ -480,11 +477,32 @@ class ProductGroupManager:
         if group_column not in dataframe.columns:
             return {'error': 'No product group column found'}
         
-        for group_key in dataframe[group_column].dropna().unique():
+        # Extracted columns backing any group's mandatory fields
+        field_columns = []
+        for group_info in self.product_groups.values():
+            for field in group_info['mandatory_fields']:
+                extracted_field = f'extracted_{field}'
+                if extracted_field in dataframe.columns and extracted_field not in field_columns:
+                    field_columns.append(extracted_field)
+        field_column_set = set(field_columns)
+        
+        # Single groupby pass over the whole frame instead of one boolean mask per group
+        group_keys = dataframe[group_column].astype('category')
+        group_sizes = group_keys.groupby(group_keys, sort=False, observed=True).size()
+        
+        if field_columns:
+            # Count meaningful data (not null, not empty, not 'nan')
+            field_text = dataframe[field_columns].astype(str)
+            non_null = dataframe[field_columns].notna().groupby(group_keys, sort=False, observed=True).sum()
+            non_empty = field_text.apply(lambda col: col.str.strip().ne('')).groupby(group_keys, sort=False, observed=True).sum()
+            meaningful = field_text.apply(lambda col: col.str.lower().ne('nan')).groupby(group_keys, sort=False, observed=True).sum()
+            actual_counts = non_null.clip(upper=non_empty).clip(upper=meaningful)
+        
+        for group_key, total_records in group_sizes.items():
             if not self.is_valid_group(group_key):
                 continue
-                
-            group_data = dataframe[dataframe[group_column] == group_key]
+            
+            total_records = int(total_records)
             mandatory_fields = self.get_mandatory_fields(group_key)
             group_info = self.get_group_info(group_key)
             
@@ -495,19 +513,14 @@ class ProductGroupManager:
             for field in mandatory_fields:
                 extracted_field = f'extracted_{field}'
                 
-                if extracted_field in group_data.columns:
-                    # Count meaningful data (not null, not empty, not 'nan')
-                    non_null = group_data[extracted_field].notna().sum()
-                    non_empty = group_data[extracted_field].astype(str).str.strip().ne('').sum()
-                    meaningful = group_data[extracted_field].astype(str).str.lower().ne('nan').sum()
-                    
-                    actual_data_count = min(non_null, non_empty, meaningful)
-                    coverage_rate = (actual_data_count / len(group_data)) * 100 if len(group_data) > 0 else 0
+                if extracted_field in field_column_set:
+                    actual_data_count = int(actual_counts.at[group_key, extracted_field])
+                    coverage_rate = (actual_data_count / total_records) * 100 if total_records > 0 else 0
                     
                     field_coverage[field] = {
                         'coverage_rate': round(coverage_rate, 2),
-                        'records_with_data': int(actual_data_count),
-                        'total_records': len(group_data),
+                        'records_with_data': actual_data_count,
+                        'total_records': total_records,
                         'will_be_exported': coverage_rate > 0
                     }
                     
@@ -518,7 +531,7 @@ class ProductGroupManager:
                     field_coverage[field] = {
                         'coverage_rate': 0.0,
                         'records_with_data': 0,
-                        'total_records': len(group_data),
+                        'total_records': total_records,
                         'will_be_exported': False,
                         'missing_field': True
                     }
@@ -527,7 +540,7 @@ class ProductGroupManager:
             
             validation_results[group_key] = {
                 'group_name': group_info['name'] if group_info else group_key,
-                'total_records': len(group_data),
+                'total_records': total_records,
                 'mandatory_fields_count': len(mandatory_fields),
                 'fields_with_data': fields_with_data,
                 'fields_to_export': fields_with_data,
@@ -579,7 +592,7 @@ class ProductGroupManager:
                         'exported_columns': export_columns
                     }
                     summary['groups_processed'] += 1
-                    summary['total_fields_exported'] += len([col for col in export_columns if col.startswith('extracted_')])
+                    summary['total_fields_exported'] += sum(1 for col in export_columns if col.startswith('extracted_'))
         
         return summary
     def get_all_groups(self):
@@ -664,8 +677,13 @@ class ProductGroupManager:
         
         # Check for valid groups
         unique_groups = df[product_group_column].dropna().unique()
-        valid_groups = [g for g in unique_groups if self.is_valid_group(g)]
-        invalid_groups = [g for g in unique_groups if not self.is_valid_group(g)]
+        valid_groups = []
+        invalid_groups = []
+        for g in unique_groups:
+            if g in self.product_groups:
+                valid_groups.append(g)
+            else:
+                invalid_groups.append(g)
         
         return {
             'valid': len(invalid_groups) == 0,
@@ -681,49 +699,66 @@ class ProductGroupManager:
         
         if product_group_column not in df.columns:
             return {'error': 'Product group column not found'}
+
+        # Only the extracted columns backing some group's mandatory fields are aggregated
+        needed_cols = set()
+        for group_info in self.product_groups.values():
+            for field in group_info['mandatory_fields']:
+                needed_cols.add(self.extracted_field_mapping.get(field, f"extracted_{field}"))
+        extracted_cols = [col for col in df.columns if col in needed_cols]
         
-        for group_key in df[product_group_column].dropna().unique():
+        # Single groupby pass: group sizes + non-null counts for every needed column
+        # (categorical keys are factorized once and reused by both aggregations)
+        group_keys = df[product_group_column].astype('category')
+        group_sizes = group_keys.groupby(group_keys, sort=False, observed=True).size()
+        filled_counts = df[extracted_cols].groupby(group_keys, sort=False, observed=True).agg(
+            {col: 'count' for col in extracted_cols}
+        ) if extracted_cols else group_sizes.to_frame().iloc[:, :0]
+        completeness_rates = filled_counts.div(group_sizes, axis=0) * 100
+        extracted_col_set = set(extracted_cols)
+
+        for group_key, total_records in group_sizes.items():
             if not self.is_valid_group(group_key):
                 continue
-                
-            group_data = df[df[product_group_column] == group_key]
+
+            total_records = int(total_records)
             mandatory_fields = self.get_mandatory_fields(group_key)
-            
+
             completeness_stats = {}
             total_filled = 0
-            total_possible = len(mandatory_fields) * len(group_data)
-            
+            total_possible = len(mandatory_fields) * total_records
+
             for field in mandatory_fields:
                 # Map to extracted field name
                 extracted_field = self.extracted_field_mapping.get(field, f"extracted_{field}")
-                
-                if extracted_field in group_data.columns:
-                    filled_records = group_data[extracted_field].notna().sum()
-                    completeness_rate = (filled_records / len(group_data)) * 100 if len(group_data) > 0 else 0
+
+                if extracted_field in extracted_col_set:
+                    filled_records = int(filled_counts.at[group_key, extracted_field])
+                    completeness_rate = float(completeness_rates.at[group_key, extracted_field])
                     total_filled += filled_records
-                    
+
                     completeness_stats[field] = {
                         'completeness_rate': round(completeness_rate, 2),
-                        'filled_records': int(filled_records),
-                        'total_records': len(group_data),
+                        'filled_records': filled_records,
+                        'total_records': total_records,
                         'extracted_field': extracted_field
                     }
                 else:
                     completeness_stats[field] = {
                         'completeness_rate': 0.0,
                         'filled_records': 0,
-                        'total_records': len(group_data),
+                        'total_records': total_records,
                         'extracted_field': extracted_field,
                         'missing': True
                     }
-            
+
             overall_completeness = (total_filled / total_possible) * 100 if total_possible > 0 else 0
-            
+
             results[group_key] = {
                 'name': self.get_group_display_name(group_key),
                 'category': self.get_group_category(group_key),
                 'priority_level': self.get_group_priority_level(group_key),
-                'total_records': len(group_data),
+                'total_records': total_records,
                 'mandatory_fields': mandatory_fields,
                 'completeness_stats': completeness_stats,
                 'overall_completeness': round(overall_completeness, 2),
@@ -7,6 +7,26 @@ import pandas as pd
 import re
 from collections import defaultdict
 
+# Final cleanup patterns (compiled once at import)
+MULTI_NEWLINE_PATTERN = re.compile(r'\n{3,}')
+MULTI_SPACE_PATTERN = re.compile(r'[ \t]{2,}')
+CRLF_PATTERN = re.compile(r'\r\n')
+CR_PATTERN = re.compile(r'\r')
+
+# Preservation patterns per mandatory field (built once, not per cleaned text)
+MANDATORY_FIELD_PRESERVE_PATTERNS = {
+    'serial_code': [r'SN[:\s]*[A-Za-z0-9]+'],
+    'wifi_ssid': [r'SSID[:\s]*[A-Za-z0-9_-]+'],
+    'wifi_passcode': [r'password[:\s]*[A-Za-z0-9@#$%^&*()_=+-]+'],
+    'vlan': [r'VLAN\s*:?\s*\d+'],
+    'ip_management': [r'IP\s*CPE[:\s]*([0-9]{1,3}\.){3}[0-9]{1,3}'],
+    'client_type': [r'(RESIDENCIAL|EMPRESARIAL|CORPORATIVO)'],
+    'technology_id': [r'(GPON|EPON|ETHERNET|MPLS|P2P)'],
+    'asn': [r'AS\s*Cliente[:\s]*\d+'],
+    'interface_1': [r'interface\s*([\w\d/\-]+)'],
+    'pop_description': [r'br\.[a-z]{2}\.[a-z]{2,}\.[a-z]{2,}\.pe\.\d+']
+}
+
 class GroupBasedTextCleaner:
     """
     Enhanced text cleaner that applies group-specific cleaning rules
@@ -43,6 +63,13 @@ class GroupBasedTextCleaner:
             (r'^\s+$', ''),
         ]
         
+        # Compiled once per cleaner: line matching is case-insensitive, the
+        # replacement itself is not (same flags the raw patterns were used with)
+        self._compiled_base_noise_patterns = [
+            (pattern, re.compile(pattern, re.IGNORECASE), re.compile(pattern), replacement)
+            for pattern, replacement in self.base_noise_patterns
+        ]
+        
         # Group-specific cleaning statistics
         self.cleaning_stats = defaultdict(lambda: {
             'total_processed': 0,
@@ -132,22 +159,9 @@ class GroupBasedTextCleaner:
         # Convert mandatory fields to regex patterns for preservation
         mandatory_patterns = []
         if mandatory_fields:
-            field_patterns = {
-                'serial_code': [r'SN[:\s]*[A-Za-z0-9]+'],
-                'wifi_ssid': [r'SSID[:\s]*[A-Za-z0-9_-]+'],
-                'wifi_passcode': [r'password[:\s]*[A-Za-z0-9@#$%^&*()_=+-]+'],
-                'vlan': [r'VLAN\s*:?\s*\d+'],
-                'ip_management': [r'IP\s*CPE[:\s]*([0-9]{1,3}\.){3}[0-9]{1,3}'],
-                'client_type': [r'(RESIDENCIAL|EMPRESARIAL|CORPORATIVO)'],
-                'technology_id': [r'(GPON|EPON|ETHERNET|MPLS|P2P)'],
-                'asn': [r'AS\s*Cliente[:\s]*\d+'],
-                'interface_1': [r'interface\s*([\w\d/\-]+)'],
-                'pop_description': [r'br\.[a-z]{2}\.[a-z]{2,}\.[a-z]{2,}\.pe\.\d+']
-            }
-            
             for field in mandatory_fields:
-                if field in field_patterns:
-                    mandatory_patterns.extend(field_patterns[field])
+                if field in MANDATORY_FIELD_PRESERVE_PATTERNS:
+                    mandatory_patterns.extend(MANDATORY_FIELD_PRESERVE_PATTERNS[field])
         
         # Combine with group-specific preserve patterns
         all_preserve_patterns = preserve_patterns + mandatory_patterns
@@ -223,16 +237,18 @@ class GroupBasedTextCleaner:
         """
         Apply base noise removal patterns while preserving critical segments
         """
-        for pattern, replacement in self.base_noise_patterns:
+        for pattern, match_regex, sub_regex, replacement in self._compiled_base_noise_patterns:
             try:
                 # For line-based patterns, process line by line
                 if pattern.startswith('^') or pattern.endswith(''):
                     lines = text.split('\n')
                     cleaned_lines = []
+                    line_end = -1
                     
-                    for line_idx, line in enumerate(lines):
+                    for line in lines:
                         # Check if this line overlaps with any preserved segment
-                        line_start = sum(len(l) + 1 for l in lines[:line_idx])  # +1 for \n
+                        # (running offset instead of re-summing all previous line lengths)
+                        line_start = line_end + 1  # +1 for \n
                         line_end = line_start + len(line)
                         
                         is_preserved = False
@@ -241,9 +257,9 @@ class GroupBasedTextCleaner:
                                 is_preserved = True
                                 break
                         
-                        if not is_preserved and re.match(pattern, line, re.IGNORECASE):
+                        if not is_preserved and match_regex.match(line):
                             # Apply replacement
-                            cleaned_lines.append(re.sub(pattern, replacement, line))
+                            cleaned_lines.append(sub_regex.sub(replacement, line))
                         else:
                             cleaned_lines.append(line)
                     
@@ -263,15 +279,15 @@ class GroupBasedTextCleaner:
         Final text cleanup and normalization
         """
         # Remove excessive whitespace
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r'[ \t]{2,}', ' ', text)
+        text = MULTI_NEWLINE_PATTERN.sub('\n\n', text)
+        text = MULTI_SPACE_PATTERN.sub(' ', text)
         
         # Remove empty lines at start/end
         text = text.strip()
         
         # Normalize line endings
-        text = re.sub(r'\r\n', '\n', text)
-        text = re.sub(r'\r', '\n', text)
+        text = CRLF_PATTERN.sub('\n', text)
+        text = CR_PATTERN.sub('\n', text)
         
         return text
     
@@ -298,16 +314,17 @@ class GroupBasedTextCleaner:
         if not isinstance(original_text, str) or not isinstance(cleaned_text, str):
             return {}
         
-        original_lines = original_text.split('\n')
-        cleaned_lines = cleaned_text.split('\n')
+        # Line counts straight from the newline count (same as len(split('\n')))
+        original_lines = original_text.count('\n') + 1
+        cleaned_lines = cleaned_text.count('\n') + 1
         
         return {
             'original_length': len(original_text),
             'cleaned_length': len(cleaned_text),
             'reduction_percent': round(100 * (1 - len(cleaned_text) / len(original_text)), 2) if len(original_text) > 0 else 0,
-            'original_lines': len(original_lines),
-            'cleaned_lines': len(cleaned_lines),
-            'lines_removed': len(original_lines) - len(cleaned_lines),
+            'original_lines': original_lines,
+            'cleaned_lines': cleaned_lines,
+            'lines_removed': original_lines - cleaned_lines,
             'chars_removed': len(original_text) - len(cleaned_text)
         }
     
@@ -4,10 +4,15 @@ Extracts fields based on product group mandatory field requirements
 """
 
 import re
+import numpy as np
 import pandas as pd
 from collections import defaultdict
 from datetime import datetime
 
+# Extraction rate thresholds (rate >= threshold moves up one status)
+EXTRACTION_STATUS_THRESHOLDS = np.array([30, 60, 80])
+EXTRACTION_STATUSES = np.array(['critical', 'needs_improvement', 'good', 'excellent'])
+
 class GroupBasedTextExtractor:
     """
     Enhanced text extractor focused on product group mandatory fields
@@ -207,6 +212,25 @@ class GroupBasedTextExtractor:
             'failed_extractions': defaultdict(int),
             'mandatory_coverage': defaultdict(float)
         })
+        
+        # Mandatory (field, priority) pairs per group, sorted by priority on first use
+        self._mandatory_field_order = {}
+        
+        # Field patterns compiled once per extractor instead of looked up in re's cache per call
+        self._compiled_field_patterns = {
+            field: self._compile_field_patterns(field, patterns)
+            for field, patterns in self.field_patterns.items()
+        }
+    
+    def _compile_field_patterns(self, field, patterns):
+        """Compile a field's patterns as (pattern, regex) pairs, skipping invalid ones"""
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append((pattern, re.compile(pattern, re.IGNORECASE | re.MULTILINE)))
+            except re.error as e:
+                print(f"⚠️ Regex error in field '{field}' with pattern '{pattern}': {e}")
+        return compiled
     
     def extract_mandatory_fields_only(self, text, product_group):
         """
@@ -216,20 +240,23 @@ class GroupBasedTextExtractor:
         if not product_group or not self.group_manager.is_valid_group(product_group):
             return {}
         
-        mandatory_fields = self.group_manager.get_mandatory_fields(product_group)
-        extraction_priorities = self.group_manager.get_extraction_priority(product_group)
-        
         results = {}
         
-        # Process mandatory fields by priority
-        sorted_fields = sorted(mandatory_fields, 
-                             key=lambda f: extraction_priorities.get(f, 5), 
-                             reverse=True)
+        # Process mandatory fields by priority (order built once per group)
+        sorted_fields = self._mandatory_field_order.get(product_group)
+        if sorted_fields is None:
+            extraction_priorities = self.group_manager.get_extraction_priority(product_group)
+            sorted_fields = self._mandatory_field_order[product_group] = [
+                (field, extraction_priorities.get(field, 5))
+                for field in sorted(self.group_manager.get_mandatory_fields(product_group),
+                                    key=lambda f: extraction_priorities.get(f, 5),
+                                    reverse=True)
+            ]
         
-        for field in sorted_fields:
+        for field, priority in sorted_fields:
             if field in self.field_patterns:
                 extracted_value = self._extract_field_with_validation(
-                    text, field, priority=extraction_priorities.get(field, 5)
+                    text, field, priority=priority
                 )
                 results[field] = extracted_value
                 
@@ -308,15 +335,24 @@ class GroupBasedTextExtractor:
                 
                 print(f"   📋 Mandatory fields: {len(mandatory_fields)}, Total fields: {len(all_group_fields)}")
                 
-                # Extract for each record in the group
-                for idx, row in group.iterrows():
-                    text = row[obs_column]
-                    
-                    if pd.isna(text) or not isinstance(text, str):
+                # Extract for each record in the group: values are collected per field
+                # and written back as whole columns (no per-cell .loc writes)
+                optional_fields = [field for field in self.group_manager.get_optional_fields(product_group)
+                                   if field in self.field_patterns]
+                field_values = {}
+                
+                def column_values(field):
+                    if field not in field_values:
+                        extracted_field = f"extracted_{field}"
+                        field_values[field] = (group[extracted_field].tolist() if extracted_field in group.columns
+                                               else [None] * len(group))
+                    return field_values[field]
+                
+                for i, text in enumerate(group[obs_column].to_numpy()):
+                    if not isinstance(text, str):
                         # Set all fields to None for empty text
                         for field in all_group_fields:
-                            extracted_field = f"extracted_{field}"
-                            group.loc[idx, extracted_field] = None
+                            column_values(field)[i] = None
                         continue
                     
                     # Extract mandatory fields first (high priority)
@@ -324,17 +360,16 @@ class GroupBasedTextExtractor:
                     
                     # Set mandatory field values
                     for field, value in mandatory_extractions.items():
-                        extracted_field = f"extracted_{field}"
-                        group.loc[idx, extracted_field] = value
+                        column_values(field)[i] = value
                     
                     # Extract optional fields (lower priority)
-                    optional_fields = self.group_manager.get_optional_fields(product_group)
                     for field in optional_fields:
-                        if field in self.field_patterns:
-                            extracted_field = f"extracted_{field}"
-                            if extracted_field not in group.columns or pd.isna(group.loc[idx, extracted_field]):
-                                value = self._extract_field_with_validation(text, field, priority=3)
-                                group.loc[idx, extracted_field] = value
+                        values = column_values(field)
+                        if pd.isna(values[i]):
+                            values[i] = self._extract_field_with_validation(text, field, priority=3)
+                
+                for field, values in field_values.items():
+                    group[f"extracted_{field}"] = values
                 
                 # Calculate group extraction summary
                 self._calculate_group_extraction_summary(group, product_group, mandatory_fields)
@@ -357,33 +392,27 @@ class GroupBasedTextExtractor:
         if field not in self.field_patterns:
             return None
         
-        patterns = self.field_patterns[field]
+        patterns = self._compiled_field_patterns[field]
         best_match = None
         best_confidence = 0
         
-        for pattern in patterns:
-            try:
-                print(f"🔍 Testing pattern for field '{field}': {pattern}")  # DEBUG LINE
-                matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            # Take the first non-empty group
-                            match = next((m for m in match if m), '')
+        for pattern, regex in patterns:
+            matches = regex.findall(text)
+            if matches:
+                for match in matches:
+                    if isinstance(match, tuple):
+                        # Take the first non-empty group
+                        match = next((m for m in match if m), '')
+                    
+                    if match and str(match).strip():
+                        clean_match = str(match).strip()
+                        confidence = self._calculate_field_confidence(
+                            pattern, clean_match, field, priority
+                        )
                         
-                        if match and str(match).strip():
-                            clean_match = str(match).strip()
-                            confidence = self._calculate_field_confidence(
-                                pattern, clean_match, field, priority
-                            )
-                            
-                            if confidence > best_confidence:
-                                best_match = clean_match
-                                best_confidence = confidence
-                                
-            except re.error as e:
-                print(f"⚠️ Regex error in field '{field}' with pattern '{pattern}': {e}")
-                continue
+                        if confidence > best_confidence:
+                            best_match = clean_match
+                            best_confidence = confidence
         
         if best_match and best_confidence > 0.4:  # Confidence threshold
             return self._clean_and_validate_field_value(best_match, field)
@@ -609,9 +638,8 @@ class GroupBasedTextExtractor:
         extraction_results = []
         field_names = list(self.field_patterns.keys())
         
-        for idx, row in df.iterrows():
-            text = row[obs_column]
-            if pd.isna(text) or not isinstance(text, str):
+        for text in df[obs_column].to_numpy():
+            if not isinstance(text, str):
                 result = {field: None for field in field_names}
             else:
                 result = self.extract_all_fields_by_group(text, product_group=None)
@@ -629,16 +657,17 @@ class GroupBasedTextExtractor:
         Generic extraction for a group without specific product group
         """
         field_names = list(self.field_patterns.keys())
+        field_values = {field: [None] * len(group) for field in field_names}
         
-        for idx, row in group.iterrows():
-            text = row[obs_column]
-            if pd.isna(text) or not isinstance(text, str):
-                for field in field_names:
-                    group.loc[idx, f'extracted_{field}'] = None
-            else:
+        for i, text in enumerate(group[obs_column].to_numpy()):
+            if isinstance(text, str):
                 extractions = self.extract_all_fields_by_group(text, product_group=None)
                 for field, value in extractions.items():
-                    group.loc[idx, f'extracted_{field}'] = value
+                    field_values[field][i] = value
+        
+        # One column assignment per field instead of a .loc write per cell
+        for field, values in field_values.items():
+            group[f'extracted_{field}'] = values
         
         return group
     
@@ -687,11 +716,14 @@ class GroupBasedTextExtractor:
         
         stats = {}
         
-        for group_name in df[product_group_column].unique():
-            if pd.isna(group_name) or not self.group_manager.is_valid_group(group_name):
+        # Row positions per group from a single hash pass (NaN groups are dropped)
+        group_indices = df.groupby(product_group_column, sort=False, observed=True).indices
+        
+        for group_name, group_idx in group_indices.items():
+            if not self.group_manager.is_valid_group(group_name):
                 continue
                 
-            group_data = df[df[product_group_column] == group_name]
+            group_data = df.iloc[group_idx]
             mandatory_fields = self.group_manager.get_mandatory_fields(group_name)
             all_fields = self.group_manager.get_all_fields(group_name)
             
@@ -707,23 +739,32 @@ class GroupBasedTextExtractor:
                 'extraction_quality_score': 0
             }
             
-            # Calculate mandatory field extraction rates
+            # Calculate mandatory field extraction rates (counted and classified for all
+            # present fields at once)
+            present_fields = [field for field in mandatory_fields if f'extracted_{field}' in group_data.columns]
+            successful_counts = group_data[[f'extracted_{field}' for field in present_fields]].notna().sum().to_numpy()
+            extraction_rates = (successful_counts / len(group_data)) * 100
+            rate_statuses = EXTRACTION_STATUSES[
+                np.searchsorted(EXTRACTION_STATUS_THRESHOLDS, extraction_rates, side='right')
+            ]
+            field_positions = {field: position for position, field in enumerate(present_fields)}
+            
             mandatory_success = 0
+            total_rate = 0.0
             for field in mandatory_fields:
-                extracted_field = f'extracted_{field}'
+                position = field_positions.get(field)
                 
-                if extracted_field in group_data.columns:
-                    successful_extractions = group_data[extracted_field].notna().sum()
-                    extraction_rate = (successful_extractions / len(group_data)) * 100
+                if position is not None:
+                    successful_extractions = successful_counts[position]
+                    extraction_rate = extraction_rates[position]
                     group_stats['mandatory_extraction_rates'][field] = {
-                        'extraction_rate': round(extraction_rate, 2),
+                        'extraction_rate': round(float(extraction_rate), 2),
                         'successful_count': int(successful_extractions),
                         'total_count': len(group_data),
-                        'status': 'excellent' if extraction_rate >= 80 else
-                                 'good' if extraction_rate >= 60 else
-                                 'needs_improvement' if extraction_rate >= 30 else 'critical'
+                        'status': str(rate_statuses[position])
                     }
                     
+                    total_rate += group_stats['mandatory_extraction_rates'][field]['extraction_rate']
                     if extraction_rate >= 50:
                         mandatory_success += 1
                 else:
@@ -753,7 +794,6 @@ class GroupBasedTextExtractor:
             ) if mandatory_fields else 0
             
             # Calculate extraction quality score
-            total_rate = sum([stats['extraction_rate'] for stats in group_stats['mandatory_extraction_rates'].values()])
             avg_rate = total_rate / len(mandatory_fields) if mandatory_fields else 0
             
             # Quality score considers both coverage and accuracy
@@ -782,26 +822,27 @@ class GroupBasedTextExtractor:
         
         mandatory_fields = self.group_manager.get_mandatory_fields(product_group) if product_group else []
         
+        # String samples as a Series so each pattern's hits are tested in one vectorized call
+        sample_texts = pd.Series([sample for sample in text_samples[:100] if isinstance(sample, str)], dtype=object)  # Limit to 100 samples for analysis
+        
         # Test each field pattern against samples
         for field in self.field_patterns:
             detection_count = 0
             pattern_hits = defaultdict(int)
             
-            for sample in text_samples[:100]:  # Limit to 100 samples for analysis
-                if not isinstance(sample, str):
-                    continue
-                
+            for sample in sample_texts:
                 extracted = self._extract_field_with_validation(sample, field, priority=5)
                 if extracted:
                     detection_count += 1
-                
-                # Track which patterns are hitting
-                for pattern in self.field_patterns[field]:
-                    try:
-                        if re.search(pattern, sample, re.IGNORECASE):
-                            pattern_hits[pattern] += 1
-                    except re.error:
-                        continue
+            
+            # Track which patterns are hitting (samples with at least one match)
+            for pattern in self.field_patterns[field]:
+                try:
+                    hits = int(sample_texts.str.contains(pattern, flags=re.IGNORECASE, regex=True).sum())
+                except re.error:
+                    continue
+                if hits:
+                    pattern_hits[pattern] = hits
             
             detection_rate = (detection_count / len(text_samples)) * 100
             analysis['field_detection_rates'][field] = {